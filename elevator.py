@@ -2,10 +2,16 @@ import enum
 import logging
 import random
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
+_rng = random.Random()
 FLOOR_MAX_LIMIT = 10
+ELEVATOR_CAPACITY = 5
+# Floor setters check membership first and call _validate_floor only
+# to report an invalid value
+_VALID_FLOORS = frozenset(range(1, FLOOR_MAX_LIMIT+1))
+_VALID_FLOORS_Z = _VALID_FLOORS | {0}
 
 
 class FloorError(Exception):
@@ -28,18 +34,28 @@ class ElevatorDoorsError(Exception):
     pass
 
 
-class StatusElevator(enum.Enum):
+class StatusElevator(enum.IntEnum):
     idle = 0
     moving = 1
     open = 2
 
 
-class Direction(enum.Enum):
+class Direction(enum.IntEnum):
     up = 0
     down = 1
 
 
+# Module-level aliases spare the enum attribute lookup in hot paths
+_UP = Direction.up
+_DOWN = Direction.down
+_IDLE = StatusElevator.idle
+_MOVING = StatusElevator.moving
+_OPEN = StatusElevator.open
+
+
 class FloorValidatorMixin:
+    __slots__ = ()
+
     def _validate_floor(self, floor: int, allow_zero: bool = False) -> None:
         if not allow_zero and floor < 1:
             raise FloorError('The floor cannot be less than 1.')
@@ -49,21 +65,28 @@ class FloorValidatorMixin:
 
 
 class Passenger(FloorValidatorMixin):
+    __slots__ = (
+        'id', '_floor_current', '_floor_destination', 'elevator_called',
+        'is_inside',
+    )
+
     id: int
-    __floor_current: int
-    __floor_destination: int
-    elevator_called: bool = False
-    is_inside: bool = False
+    _floor_current: int
+    _floor_destination: int
+    elevator_called: bool
+    is_inside: bool
 
     def __init__(
         self, floor: Optional[int] = None, id: Optional[int] = None
     ) -> None:
+        self.elevator_called = False
+        self.is_inside = False
         if floor:
             self.floor_current = floor
         else:
-            self.floor_current = random.randint(1, FLOOR_MAX_LIMIT)
+            self.floor_current = _rng.randrange(1, FLOOR_MAX_LIMIT+1)
         if not id:
-            self.id = random.randint(1, 1000)
+            self.id = _rng.randrange(1, 1001)
         else:
             self.id = id
         self.generate_destination()
@@ -72,40 +95,46 @@ class Passenger(FloorValidatorMixin):
         return f'Passenger {self.id}'
 
     def generate_destination(self) -> None:
-        self.floor_destination = self.floor_current
-        while self.floor_destination == self.floor_current:
-            self.floor_destination = random.randint(1, FLOOR_MAX_LIMIT)
+        # Pick one of the other floors, skipping over the current one
+        floor = _rng.randrange(1, FLOOR_MAX_LIMIT)
+        if floor >= self._floor_current:
+            floor += 1
+        self.floor_destination = floor
 
     @property
     def floor_current(self) -> int:
-        return self.__floor_current
+        return self._floor_current
 
     @floor_current.setter
     def floor_current(self, floor: int) -> None:
-        self._validate_floor(floor, allow_zero=True)
-        self.__floor_current = floor
+        if floor not in _VALID_FLOORS_Z:
+            self._validate_floor(floor, allow_zero=True)
+        self._floor_current = floor
 
     @property
     def floor_destination(self) -> int:
-        return self.__floor_destination
+        return self._floor_destination
 
     @floor_destination.setter
     def floor_destination(self, floor: int) -> None:
-        self._validate_floor(floor)
-        self.__floor_destination = floor
+        if floor not in _VALID_FLOORS:
+            self._validate_floor(floor)
+        self._floor_destination = floor
 
     def call_elevator(self, elevator: 'Elevator') -> None:
-        elevator.add_floor_outside(self.__floor_current)
-        self.elevator_called = True
+        elevator.add_floor_outside(self._floor_current)
+        if not self.elevator_called:
+            elevator.waiting_by_floor[self._floor_current].append(self)
+            self.elevator_called = True
 
     def enter_elevator(self, elevator: 'Elevator') -> None:
-        elevator.add_floor_outside(self.__floor_destination)
+        elevator.add_floor_outside(self._floor_destination)
         self.is_inside = True
         self.elevator_called = False
-        self.floor_current = 0
+        self._floor_current = 0
 
     def leave_elevator(self, elevator: 'Elevator') -> None:
-        self.floor_current = elevator.floor
+        self._floor_current = elevator.floor
         self.is_inside = False
         self.generate_destination()
 
@@ -115,141 +144,213 @@ class Passenger(FloorValidatorMixin):
 
 
 class Elevator(FloorValidatorMixin):
+    __slots__ = (
+        'status', '_direction', '_floor', '_floors_queue', 'passengers',
+        'waiting_by_floor', 'capacity', '_version',
+    )
+
     status: StatusElevator
-    direction: Direction
-    __floor: int
-    __floors_queue: set[int]
-    passengers: set[Passenger]
+    _direction: Direction
+    _floor: int
+    _floors_queue: int  # Bitmask, bit N set when floor N is queued
+    passengers: List[Passenger]
+    waiting_by_floor: Dict[int, List[Passenger]]
     capacity: int
-
-    def __init__(self, capacity: int = 5) -> None:
-        self.status = StatusElevator.idle
-        self.direction = Direction.up
-        self.__floor = 1
-        self.__floors_queue = set()
-        self.passengers = set()
+    _version: int  # Bumped on every state change
+
+    def __init__(self, capacity: int = ELEVATOR_CAPACITY) -> None:
+        self.status = _IDLE
+        self._direction = _UP
+        self._floor = 1
+        self._floors_queue = 0
+        self.passengers = []
+        self.waiting_by_floor = {
+            floor: [] for floor in range(1, FLOOR_MAX_LIMIT+1)
+        }
         self.capacity = capacity
-        logger.debug(f'Elevator created. {random.randint(0, 100)}')
+        self._version = 0
+        logger.debug('Elevator created. %d', _rng.randrange(0, 101))
 
     @property
     def floor(self) -> int:
-        return self.__floor
+        return self._floor
 
     @floor.setter
     def floor(self, floor: int) -> None:
-        self._validate_floor(floor)
-        self.__floor = floor
+        if floor not in _VALID_FLOORS:
+            self._validate_floor(floor)
+        self._floor = floor
+
+    @property
+    def direction(self) -> Direction:
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction: Direction) -> None:
+        # Keep a Direction member, so hot paths can use its name directly
+        self._direction = Direction(direction)
 
-    def get_floors_queue(self):
-        return self.__floors_queue
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get_floors_queue(self) -> set[int]:
+        queue = self._floors_queue
+        return {
+            floor for floor in range(1, FLOOR_MAX_LIMIT+1)
+            if queue >> floor & 1
+        }
 
     def add_floor_inside(self, floor: int) -> None:
         """ Add floor to the floors queue from inside the elevator. """
         self._validate_floor(floor)
-        self.__floors_queue.add(floor)
+        self._floors_queue |= 1 << floor
 
     def add_floor_outside(self, floor: int) -> None:
         """ Add floor to the floors queue from outside the elevator. """
         self._validate_floor(floor)
-        self.__floors_queue.add(floor)
+        self._floors_queue |= 1 << floor
 
     def change_direction(self):
-        if self.direction == Direction.up:
-            self.direction = Direction.down
-        else:
-            self.direction = Direction.up
+        # up = 0, down = 1
+        self._direction = Direction(self._direction ^ 1)
 
-    def move(
-        self, all_passengers: Optional[List[List[Passenger]]] = None
-    ) -> None:
-        """ Move the elevator by one floor. """
-        if len(self.__floors_queue) == 0:
+    def move(self) -> None:
+        """ Move the elevator to the next queued floor in its direction. """
+        if not self._floors_queue:
             return
-        if self.status == StatusElevator.open:
+        if self.status == _OPEN:
             raise ElevatorMoveError('Doors open. Elevator cannot move.')
 
-        logger.debug(
-            f'Elevator starts moving. Current floor: {self.floor}. '
-            f'Direction: {self.direction.name}.'
-        )
-        self.status = StatusElevator.moving
-        try:
-            if self.direction == Direction.up:
-                self.floor += 1
+        self._version += 1
+        queue = self._floors_queue
+        if queue >> self._floor & 1:
+            # Current floor is requested. Stop here without moving.
+            self._serve_floor()
+        else:
+            below_mask = (1 << self._floor) - 1
+            up = self._direction == _UP
+            ahead = queue & ~below_mask if up else queue & below_mask
+            if not ahead:
+                # Nothing left in the direction. Reverse and go to the
+                # nearest floor on the other side within the same move.
+                self.change_direction()
+                logger.debug(
+                    'No floors in the direction. Direction changed: %s.',
+                    self._direction.name
+                )
+                up = not up
+                ahead = queue
+
+            if up:
+                # Lowest queued floor above the current one
+                target = (ahead & -ahead).bit_length() - 1
             else:
-                self.floor -= 1
-
-            self.status = StatusElevator.idle
-
-            if self.floor in self.__floors_queue:
-                self.open_doors()
-                if all_passengers:
-                    for passenger in all_passengers[self.floor]:
-                        self.add_passenger(passenger)
-                for passenger in self.passengers.copy():
-                    if passenger.floor_destination == self.floor:
-                        self.remove_passenger(passenger)
-                self.close_doors()
-                self.__floors_queue.remove(self.floor)
-        except FloorError:
-            """ Top or down floor limits. """
-            self.status = StatusElevator.idle
-            logger.debug('Elevator moving. Floor limit reached.')
-
-        if self.floor == 1:
-            self.direction = Direction.up
-        elif self.floor == FLOOR_MAX_LIMIT:
-            self.direction = Direction.down
+                # Highest queued floor below the current one
+                target = ahead.bit_length() - 1
+
+            logger.debug(
+                'Elevator starts moving. Current floor: %d. Direction: %s.',
+                self._floor, self._direction.name
+            )
+            self.status = _MOVING
+            # Queued floors are validated on insertion, skip the setter
+            self._floor = target
+            self.status = _IDLE
+            self._serve_floor()
+
+        if self._floor == 1:
+            self._direction = _UP
+        elif self._floor == FLOOR_MAX_LIMIT:
+            self._direction = _DOWN
         else:
             # Check if no more floors in the direction and change direction
-            need_change = True
-            for floor in self.__floors_queue:
-                if self.direction == Direction.up:
-                    if floor > self.floor:
-                        need_change = False
-                        break
-                else:
-                    if floor < self.floor:
-                        need_change = False
-                        break
-
+            below_mask = (1 << self._floor) - 1
+            up_mask = self._floors_queue & ~below_mask & ~(1 << self._floor)
+            down_mask = self._floors_queue & below_mask
+            need_change = (
+                (self._direction == _UP and up_mask == 0)
+                or (self._direction == _DOWN and down_mask == 0)
+            )
             if need_change:
                 self.change_direction()
 
         logger.debug(
-            f'Elevator finished moving. Current floor: {self.floor}. '
-            f'Direction: {self.direction.name}.'
+            'Elevator finished moving. Current floor: %d. Direction: %s.',
+            self._floor, self._direction.name
         )
 
+    def step_n(self, ticks: int) -> int:
+        """ Run up to `ticks` moves. Return count of moves made. """
+        move = self.move
+        for tick in range(ticks):
+            if not self._floors_queue:
+                return tick
+            move()
+        return ticks
+
+    def _serve_floor(self) -> None:
+        """ Open doors, let passengers in and out, close doors. """
+        self.open_doors()
+        # Board from the head of the waiting list up to capacity, dropping
+        # stale entries (already inside or no longer calling) on the way
+        waiting = self.waiting_by_floor[self._floor]
+        taken = 0
+        for passenger in waiting:
+            if len(self.passengers) >= self.capacity:
+                break
+            taken += 1
+            if not passenger.is_inside and passenger.elevator_called:
+                self._board(passenger)
+        del waiting[:taken]
+        for passenger in self.passengers[:]:
+            if passenger.floor_destination == self._floor:
+                self.remove_passenger(passenger)
+        self.close_doors()
+        self._floors_queue &= ~(1 << self._floor)
+
     def open_doors(self):
-        if self.status != StatusElevator.idle:
+        if self.status != _IDLE:
             raise ElevatorDoorsError(
                 'Cannot open doors. Elevator is not in idle status.')
-        self.status = StatusElevator.open
+        self.status = _OPEN
         logger.debug('Elevator doors opened.')
 
     def close_doors(self):
-        if self.status != StatusElevator.open:
+        if self.status != _OPEN:
             raise ElevatorDoorsError(
                 'Cannot close doors. Doors are not opened.')
-        self.status = StatusElevator.idle
+        self.status = _IDLE
         logger.debug('Elevator doors closed.')
 
     def add_passenger(self, passenger: Passenger) -> None:
-        if self.status != StatusElevator.open:
+        if self.status != _OPEN:
             raise EnterElevatorError('Doors closed. Passenger cannot enter.')
-        if passenger in self.passengers:
+        if passenger.is_inside:
             raise EnterElevatorError('Passenger already in elevator.')
         if len(self.passengers) < self.capacity and passenger.elevator_called:
-            self.passengers.add(passenger)
-            passenger.enter_elevator(self)
-            logger.debug(f'{passenger} entered elevator.')
+            # Passenger may have called without being registered here
+            waiting = self.waiting_by_floor[passenger.floor_current]
+            if passenger in waiting:
+                waiting.remove(passenger)
+            self._board(passenger)
+
+    def _board(self, passenger: Passenger) -> None:
+        self.passengers.append(passenger)
+        self._version += 1
+        passenger.enter_elevator(self)
+        logger.debug('%s entered elevator.', passenger)
 
     def remove_passenger(self, passenger: Passenger) -> None:
-        if self.status != StatusElevator.open:
+        if self.status != _OPEN:
             raise EnterElevatorError('Doors closed. Passenger cannot remove.')
-        if passenger not in self.passengers:
+        if not passenger.is_inside:
+            raise EnterElevatorError('Passenger not in elevator.')
+        try:
+            self.passengers.remove(passenger)
+        except ValueError:
+            # Inside another elevator
             raise EnterElevatorError('Passenger not in elevator.')
-        self.passengers.remove(passenger)
+        self._version += 1
         passenger.leave_elevator(self)
-        logger.debug(f'{passenger} leaved elevator.')
+        logger.debug('%s leaved elevator.', passenger)
@@ -0,0 +1,78 @@
+from typing import Union
+
+import numpy as np
+
+from elevator import FLOOR_MAX_LIMIT, Direction, FloorValidatorMixin
+
+# Bit length of every possible floors queue mask
+_BIT_LENGTH = np.array(
+    [mask.bit_length() for mask in range(1 << (FLOOR_MAX_LIMIT+1))],
+    dtype=np.int64
+)
+
+
+class ElevatorBatch(FloorValidatorMixin):
+    """ Passenger-less elevators of many simulation replicas as arrays.
+
+    step() moves every replica the same way Elevator.move does.
+    """
+    __slots__ = ('floor', 'direction', 'queue_mask')
+
+    floor: np.ndarray
+    direction: np.ndarray
+    queue_mask: np.ndarray  # Bit N set when floor N is queued
+
+    def __init__(self, replicas: int) -> None:
+        self.floor = np.ones(replicas, dtype=np.int8)
+        self.direction = np.full(replicas, Direction.up, dtype=np.int8)
+        self.queue_mask = np.zeros(replicas, dtype=np.uint16)
+
+    def add_floor(
+        self, floor: int, replicas: Union[int, np.ndarray, None] = None
+    ) -> None:
+        """ Add floor to the queue of given replicas, all by default. """
+        self._validate_floor(floor)
+        if replicas is None:
+            replicas = slice(None)
+        self.queue_mask[replicas] |= np.uint16(1 << floor)
+
+    def step(self) -> None:
+        """ Move every replica to its next queued floor. """
+        floor = self.floor.astype(np.int64)
+        queue = self.queue_mask.astype(np.int64)
+        up = self.direction == Direction.up
+
+        floor_bit = np.left_shift(1, floor)
+        below_mask = floor_bit - 1
+        ahead = np.where(up, queue & ~below_mask & ~floor_bit,
+                         queue & below_mask)
+        here = (queue & floor_bit) != 0
+        moving = (queue != 0) & ~here
+        # Nothing left in the direction: reverse and take the other side
+        reversing = moving & (ahead == 0)
+        up = up ^ reversing
+        ahead = np.where(reversing, queue, ahead)
+        direction = np.where(reversing, self.direction ^ 1, self.direction)
+
+        # Nearest queued floor in the direction: lowest bit above or
+        # highest bit below the current floor
+        nearest = np.where(up, ahead & -ahead, ahead)
+        target = _BIT_LENGTH[nearest] - 1
+        floor = np.where(moving, target, floor)
+        served = here | moving
+        queue = np.where(
+            served, queue & ~np.left_shift(1, floor), queue)
+
+        # Direction after a stop, as at the end of Elevator.move
+        floor_bit = np.left_shift(1, floor)
+        below_mask = floor_bit - 1
+        ahead = np.where(up, queue & ~below_mask & ~floor_bit,
+                         queue & below_mask)
+        direction = np.where(served & (ahead == 0), direction ^ 1, direction)
+        direction = np.where(served & (floor == 1), Direction.up, direction)
+        direction = np.where(
+            served & (floor == FLOOR_MAX_LIMIT), Direction.down, direction)
+
+        self.floor = floor.astype(np.int8)
+        self.direction = direction.astype(np.int8)
+        self.queue_mask = queue.astype(np.uint16)
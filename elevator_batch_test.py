@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from elevator import FLOOR_MAX_LIMIT, Direction, Elevator, FloorError
+from elevator_batch import ElevatorBatch
+
+
+FLOOR_VALIDATE_ARGS = ['floor', [-1, 0, FLOOR_MAX_LIMIT+1]]
+
+
+class TestElevatorBatch:
+    """ Tests for ElevatorBatch class. """
+
+    def test_add_floor(self):
+        batch = ElevatorBatch(3)
+        batch.add_floor(4, np.array([0, 2]))
+        assert list(batch.queue_mask) == [1 << 4, 0, 1 << 4]
+
+    @pytest.mark.parametrize(*FLOOR_VALIDATE_ARGS)
+    def test_add_floor_validate(self, floor):
+        with pytest.raises(FloorError):
+            ElevatorBatch(1).add_floor(floor)
+
+    def test_step_matches_elevator(self):
+        rng = random.Random(0)
+        replicas = 200
+        batch = ElevatorBatch(replicas)
+        elevators = [Elevator() for _ in range(replicas)]
+        for i, elevator in enumerate(elevators):
+            elevator.floor = rng.randint(1, FLOOR_MAX_LIMIT)
+            elevator.direction = rng.choice(list(Direction))
+            batch.floor[i] = elevator.floor
+            batch.direction[i] = elevator.direction
+        for _ in range(30):
+            for i, elevator in enumerate(elevators):
+                if rng.random() < 0.3:
+                    floor = rng.randint(1, FLOOR_MAX_LIMIT)
+                    elevator.add_floor_inside(floor)
+                    batch.add_floor(floor, i)
+            batch.step()
+            for elevator in elevators:
+                elevator.move()
+            assert list(batch.floor) == [e.floor for e in elevators]
+            assert list(batch.direction) == [e.direction for e in elevators]
+            assert [
+                {f for f in range(1, FLOOR_MAX_LIMIT+1) if mask >> f & 1}
+                for mask in batch.queue_mask
+            ] == [e.get_floors_queue() for e in elevators]
@@ -46,6 +46,21 @@ class TestPassenger:
         passenger.call_elevator(elevator)
         mock_add_floor_outside.assert_called_once_with(passenger.floor_current)
 
+    def test_call_elevator_waiting(
+        self, passenger: Passenger, elevator: Elevator
+    ):
+        floor = passenger.floor_current
+        passenger.call_elevator(elevator)
+        assert passenger in elevator.waiting_by_floor[floor]
+
+    def test_call_elevator_twice(self, elevator: Elevator):
+        passenger = Passenger(floor=2)
+        passenger.call_elevator(elevator)
+        passenger.call_elevator(elevator)
+        assert elevator.waiting_by_floor[2] == [passenger]
+        elevator.move()
+        assert elevator.passengers == [passenger]
+
     @mock.patch('elevator.Passenger.generate_destination')
     def test_leave_elevator(
         self, mock_generate_destination, passenger: Passenger,
@@ -107,35 +122,40 @@ class TestElevator:
         assert elevator.floor == 1
 
     @pytest.mark.parametrize(
-        'floor_start, floor_end, direction_start, direction_end',
+        'floor_start, floor_end, direction_start',
         [
-            (1, 2, Direction.down, Direction.up),
-            (FLOOR_MAX_LIMIT, 1, Direction.up, Direction.down)
+            (1, 2, Direction.down),
+            (FLOOR_MAX_LIMIT, 1, Direction.up),
+            (5, 2, Direction.up),
+            (5, 8, Direction.down),
         ]
     )
-    def test_move_direction_change_limits(
-        self, elevator: Elevator, floor_start, floor_end,
-        direction_start, direction_end
+    def test_move_reverse_nothing_ahead(
+        self, elevator: Elevator, floor_start, floor_end, direction_start
     ):
+        # Only queued floor is behind. Reverse and reach it in one move.
         elevator.floor = floor_start
         elevator.direction = direction_start
         elevator.add_floor_inside(floor_end)
-        elevator.move()
-        assert elevator.floor == floor_start
-        assert elevator.direction == direction_end
+        assert elevator.step_n(10) == 1
+        assert elevator.floor == floor_end
+        assert elevator.get_floors_queue() == set()
 
     @pytest.mark.parametrize(
-        'floor_destination, is_called', [(2, True), (3, False)]
+        'floor_destination, direction, is_called',
+        [(2, Direction.up, True), (3, Direction.up, True),
+         (3, Direction.down, True), (None, Direction.up, False)]
     )
     @mock.patch('elevator.Elevator.open_doors')
     @mock.patch('elevator.Elevator.close_doors')
     def test_move_doors(
         self, mock_open_doors, mock_close_doors, elevator: Elevator,
-        floor_destination, is_called
+        floor_destination, direction, is_called
     ):
         elevator.floor = 1
-        elevator.direction = Direction.up
-        elevator.add_floor_inside(floor_destination)
+        elevator.direction = direction
+        if floor_destination:
+            elevator.add_floor_inside(floor_destination)
         elevator.move()
         if is_called:
             mock_open_doors.assert_called_once()
@@ -150,12 +170,48 @@ class TestElevator:
         elevator.floor = 1
         elevator.direction = Direction.up
         elevator.add_floor_inside(2)
-        elevator.passengers.add(passenger)
+        elevator.passengers.append(passenger)
+        passenger.is_inside = True
         passenger.floor_destination = 2
         assert passenger in elevator.passengers
         elevator.move()
         assert passenger not in elevator.passengers
 
+    def test_move_to_next_queued_floor(self, elevator: Elevator):
+        elevator.floor = 2
+        elevator.direction = Direction.up
+        elevator.add_floor_inside(7)
+        elevator.add_floor_inside(5)
+        elevator.move()
+        assert elevator.floor == 5
+        assert elevator.get_floors_queue() == {7}
+
+    def test_move_current_floor_queued(self, elevator: Elevator):
+        elevator.floor = 4
+        elevator.add_floor_outside(4)
+        elevator.move()
+        assert elevator.floor == 4
+        assert elevator.get_floors_queue() == set()
+
+    def test_move_passengers_enter_capacity(self):
+        elevator = Elevator(capacity=2)
+        passengers = [Passenger(floor=2) for _ in range(3)]
+        for passenger in passengers:
+            passenger.call_elevator(elevator)
+        elevator.move()
+        assert elevator.passengers == passengers[:2]
+        assert elevator.waiting_by_floor[2] == passengers[2:]
+
+    def test_move_passengers_enter_stale_waiting(self, elevator: Elevator):
+        inside = Passenger(floor=2)
+        inside.call_elevator(elevator)
+        inside.enter_elevator(elevator)
+        not_called = Passenger(floor=2)
+        elevator.waiting_by_floor[2].append(not_called)
+        elevator.move()
+        assert elevator.passengers == []
+        assert elevator.waiting_by_floor[2] == []
+
     @pytest.mark.parametrize(
         'start_direction, end_direction',
         [(Direction.up, Direction.down), (Direction.down, Direction.up)]
@@ -171,6 +227,23 @@ class TestElevator:
         # No more floors upstairs. Change direction
         assert elevator.direction == end_direction
 
+    def test_version(self, elevator: Elevator, passenger: Passenger):
+        version = elevator.version
+        elevator.move()
+        assert elevator.version == version
+        passenger.call_elevator(elevator)
+        elevator.move()
+        assert elevator.version > version
+
+    def test_step_n(self, elevator: Elevator):
+        elevator.floor = 1
+        elevator.direction = Direction.up
+        elevator.add_floor_inside(3)
+        elevator.add_floor_inside(6)
+        assert elevator.step_n(10) == 2
+        assert elevator.floor == 6
+        assert elevator.get_floors_queue() == set()
+
     @pytest.mark.parametrize(
         'wrong_status', [s for s in StatusElevator if s != StatusElevator.idle]
     )
@@ -179,6 +252,18 @@ class TestElevator:
             elevator.status = wrong_status
             elevator.open_doors()
 
+    def test_open_doors_int_status(self, elevator: Elevator):
+        elevator.status = 0
+        elevator.open_doors()
+        assert elevator.status == StatusElevator.open
+
+    def test_move_int_direction(self, elevator: Elevator):
+        elevator.floor = 5
+        elevator.direction = 1
+        elevator.add_floor_inside(2)
+        elevator.move()
+        assert elevator.floor == 2
+
     def test_open_doors_success(self, elevator: Elevator):
         elevator.status = StatusElevator.idle
         elevator.open_doors()
@@ -212,7 +297,8 @@ class TestElevator:
     ):
         with pytest.raises(EnterElevatorError):
             elevator.status = StatusElevator.open
-            elevator.passengers.add(passenger)
+            elevator.passengers.append(passenger)
+            passenger.is_inside = True
             elevator.add_passenger(passenger)
 
     def test_add_passenger_success(
@@ -223,6 +309,23 @@ class TestElevator:
         elevator.add_passenger(passenger)
         assert passenger in elevator.passengers
 
+    def test_add_passenger_waiting(
+        self, elevator: Elevator, passenger: Passenger
+    ):
+        floor = passenger.floor_current
+        passenger.call_elevator(elevator)
+        elevator.status = StatusElevator.open
+        elevator.add_passenger(passenger)
+        assert passenger not in elevator.waiting_by_floor[floor]
+
+    def test_add_passenger_unregistered(
+        self, elevator: Elevator, passenger: Passenger
+    ):
+        passenger.call_elevator(Elevator())
+        elevator.status = StatusElevator.open
+        elevator.add_passenger(passenger)
+        assert passenger in elevator.passengers
+
     @pytest.mark.parametrize(
         'wrong_status', [s for s in StatusElevator if s != StatusElevator.open]
     )
@@ -240,6 +343,17 @@ class TestElevator:
             elevator.status = StatusElevator.open
             elevator.remove_passenger(passenger)
 
+    def test_remove_passenger_other_elevator(
+        self, elevator: Elevator, passenger: Passenger
+    ):
+        other = Elevator()
+        other.status = StatusElevator.open
+        passenger.elevator_called = True
+        other.add_passenger(passenger)
+        with pytest.raises(EnterElevatorError):
+            elevator.status = StatusElevator.open
+            elevator.remove_passenger(passenger)
+
     def test_remove_passenger_success(
         self, elevator: Elevator, passenger: Passenger
     ):
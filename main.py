@@ -1,9 +1,11 @@
+import collections
+import functools
 import logging
 import random
 import time
 
 from logging.handlers import BufferingHandler
-from typing import List
+from typing import Deque, List, Optional, Tuple
 
 from rich.console import Console
 from rich.layout import Layout
@@ -11,18 +13,37 @@ from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 
-from elevator import FLOOR_MAX_LIMIT, Elevator, Passenger
+from elevator import ELEVATOR_CAPACITY, FLOOR_MAX_LIMIT, Elevator, Passenger
 
 PASSENGERS_LIMIT = 10
 TICK_IN_SEC = 2  # Tick duration in sec
 manual_tick = False  # Enter to continue
 
+EMPTY_CAR = '|     |'
+
+
+def format_passengers_inside(count: int) -> str:
+    if count < 10:
+        return f'_{count}_'
+    elif count < 100:
+        return f'_{count}'
+    return f'{count}'
+
+
+# Passengers inside label, indexed by passengers count up to the default
+# capacity. Larger counts are formatted on demand.
+PASSENGER_LABELS = [
+    format_passengers_inside(i) for i in range(0, ELEVATOR_CAPACITY+1)
+]
+
 logger_elevator = logging.getLogger("elevator")
 logger_elevator.setLevel(logging.DEBUG)
 buffering_handler = BufferingHandler(capacity=21)
 logger_elevator.addHandler(buffering_handler)
 
-log_messages = []
+log_messages: Deque[str] = collections.deque(maxlen=21)
+# (elevator version, passengers version) of the last rendered frame
+last_render_version: Optional[Tuple[int, int]] = None
 
 console = Console()
 
@@ -54,68 +75,68 @@ class Header:
         return Panel(grid, style="white on blue")
 
 
-def render_elevator(
-    elevator: Elevator, passengers: List[List[Passenger]]
+def render_elevator(elevator: Elevator) -> str:
+    # waiting_by_floor is filled for floors 1..FLOOR_MAX_LIMIT in order
+    return _render_elevator_cached(
+        elevator.floor,
+        len(elevator.passengers),
+        tuple(map(len, elevator.waiting_by_floor.values())),
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _render_elevator_cached(
+    elevator_floor: int, count_passengers_inside: int,
+    floor_counts: Tuple[int, ...]
 ) -> str:
-    elevator_str = '+-----+\n'
+    """Build elevator view. Pure on its arguments, so the result is cached."""
+    parts: List[str] = ['+-----+\n']
 
-    count_passengers_inside = len(elevator.passengers)
-    if count_passengers_inside < 10:
-        passengers_inside_str = f'_{count_passengers_inside}_'
-    elif count_passengers_inside < 100:
-        passengers_inside_str = f'_{count_passengers_inside}'
+    if count_passengers_inside < len(PASSENGER_LABELS):
+        passengers_inside_str = PASSENGER_LABELS[count_passengers_inside]
     else:
-        passengers_inside_str = f'{count_passengers_inside}'
+        passengers_inside_str = format_passengers_inside(
+            count_passengers_inside)
     for floor in range(FLOOR_MAX_LIMIT, 0, -1):
-        if elevator.floor == floor:
+        if elevator_floor == floor:
             elevator_str_cur = f'|[b]|{passengers_inside_str}|[/b]|'
             elevator_pointer = ' <--Elevator'
         else:
-            elevator_str_cur = '|     |'
+            elevator_str_cur = EMPTY_CAR
             elevator_pointer = ''
-        elevator_str += f"""\
-{elevator_str_cur} {floor}f {len(passengers[floor])}p {elevator_pointer}
-+-----+
-"""
-    return elevator_str
+        parts.append(
+            f'{elevator_str_cur} {floor}f {floor_counts[floor - 1]}p '
+            f'{elevator_pointer}\n+-----+\n'
+        )
+    return "".join(parts)
 
 
-def render(
-    layout, passengers: List[List[Passenger]], elevator: Elevator
-) -> None:
+def render(layout, elevator: Elevator, passengers_version: int) -> None:
+    global last_render_version
+    version = (elevator.version, passengers_version)
+    if version == last_render_version:
+        return
+    last_render_version = version
+
     layout["elevator"].update(Panel(
-        render_elevator(elevator, passengers),
+        render_elevator(elevator),
         border_style="green"
     ))
     layout['logs'].update(get_log())
 
 
-def passengers_tick(
-    passengers: List[List[Passenger]], elevator: Elevator
-) -> None:
-    for floor in range(1, len(passengers)):
-        for passenger in passengers[floor]:
-            passenger.tick(elevator)
-
-
-def passengers_tick_end(passengers: List[List[Passenger]]) -> None:
-    for floor in range(1, len(passengers)):
-        for passenger in list(passengers[floor]):
-            if passenger.floor_current != floor:
-                passengers[0].append(passenger)
-                passengers[floor].remove(passenger)
-
-    for passenger in list(passengers[0]):
-        if not passenger.is_inside:
-            passengers[passenger.floor_current].append(passenger)
-            passengers[0].remove(passenger)
+def call_pending(pending: List[Passenger], elevator: Elevator) -> int:
+    """Let pending passengers call the elevator. Return their count."""
+    count = len(pending)
+    for passenger in pending:
+        passenger.tick(elevator)
+    pending.clear()
+    return count
 
 
 def get_log():
     for li in buffering_handler.buffer:
-        if len(log_messages) > 21:
-            log_messages.pop(0)
-        log_messages.append(li.msg)
+        log_messages.append(li.getMessage())
     buffering_handler.flush()
     return Panel("\n".join(log_messages))
 
@@ -125,29 +146,30 @@ def main():
     layout["header"].update(Header())
 
     elevator = Elevator()
-    passengers: List[List[Passenger]] = []
-    for _ in range(0, FLOOR_MAX_LIMIT+1):
-        passengers.append([])
+    # Passengers who are about to call the elevator
+    pending: List[Passenger] = []
     for _ in range(PASSENGERS_LIMIT):
         rand_floor = random.randint(1, FLOOR_MAX_LIMIT)
-        passengers[rand_floor].append(
-            Passenger(floor=rand_floor)
-        )
+        pending.append(Passenger(floor=rand_floor))
+    passengers_version = call_pending(pending, elevator)
 
     with Live(layout, refresh_per_second=10, screen=True):
         time_start = time.time()
-        render(layout, passengers, elevator)
+        render(layout, elevator, passengers_version)
         while True:
             try:
                 time.sleep(0.1)
                 if time.time() - time_start > TICK_IN_SEC:
                     time_start = time.time()
 
-                    passengers_tick(passengers, elevator)
-                    elevator.move(passengers)
-                    passengers_tick_end(passengers)
+                    inside_before = elevator.passengers[:]
+                    elevator.move()
+                    # Passengers who left call the elevator again right away
+                    pending.extend(
+                        p for p in inside_before if not p.is_inside)
+                    passengers_version += call_pending(pending, elevator)
 
-                    render(layout, passengers, elevator)
+                    render(layout, elevator, passengers_version)
 
                     if manual_tick:
                         input()